@@ -13,6 +13,7 @@ logging.basicConfig(
 )
 
 DEFAULT_PORT = 79
+RECV_BUFSIZE = 65536  # 64 KiB per recv() call
 
 def query_finger_server(
     host: str,
@@ -35,6 +36,8 @@ def query_finger_server(
     try:
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
             s.connect((host, port))
+            # Send the short query immediately instead of waiting on Nagle
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             
             # Format query according to finger protocol
             if long_format:
@@ -43,15 +46,16 @@ def query_finger_server(
             
             s.send(query.encode())
             
-            # Receive response
-            chunks = []
+            # Receive response into a reusable buffer
+            response = bytearray()
+            view = memoryview(bytearray(RECV_BUFSIZE))
             while True:
-                chunk = s.recv(4096)
-                if not chunk:
+                n = s.recv_into(view, RECV_BUFSIZE)
+                if not n:
                     break
-                chunks.append(chunk)
+                response += view[:n]
             
-            return b"".join(chunks).decode()
+            return response.decode()
     except ConnectionRefusedError:
         logging.error(f"Connection refused to {host}:{port}")
         logging.error("Make sure the finger server is running and the port is correct")
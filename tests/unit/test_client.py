@@ -10,6 +10,17 @@ import pytest
 from finger_client import query_finger_server
 
 
+def mock_recv_into(mock_sock, *chunks):
+    """Make mock_sock.recv_into deliver each chunk in turn, then EOF."""
+    pending = [*chunks, b""]
+
+    def recv_into(buffer, nbytes=0):
+        chunk = pending.pop(0)
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+    mock_sock.recv_into.side_effect = recv_into
+
 @pytest.fixture
 def test_config():
     """Test configuration fixture."""
@@ -27,12 +38,13 @@ def test_query_finger_server_success(mocker, test_config):
     mock_socket.return_value.__enter__.return_value = mock_sock
     
     # Mock successful response
-    mock_sock.recv.side_effect = [b"Test response", b""]
+    mock_recv_into(mock_sock, b"Test response")
     
     response = query_finger_server(test_config["host"], test_config["query"], test_config["port"])
     
     # Verify socket operations
     mock_sock.connect.assert_called_once_with((test_config["host"], test_config["port"]))
+    mock_sock.setsockopt.assert_called_once_with(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
     mock_sock.send.assert_called_once_with(f"{test_config['query']}@{test_config['host']}\r\n".encode())
     assert response == "Test response"
 
@@ -41,7 +53,7 @@ def test_query_finger_server_with_long_format(mocker, test_config):
     mock_sock = mocker.MagicMock()
     mock_socket = mocker.patch("socket.socket")
     mock_socket.return_value.__enter__.return_value = mock_sock
-    mock_sock.recv.side_effect = [b"Detailed response", b""]
+    mock_recv_into(mock_sock, b"Detailed response")
     
     response = query_finger_server(test_config["host"], test_config["query"], test_config["port"], long_format=True)
     
@@ -72,7 +84,7 @@ def test_query_finger_server_empty_query(mocker, test_config):
     mock_sock = mocker.MagicMock()
     mock_socket = mocker.patch("socket.socket")
     mock_socket.return_value.__enter__.return_value = mock_sock
-    mock_sock.recv.side_effect = [b"Project list", b""]
+    mock_recv_into(mock_sock, b"Project list")
     
     response = query_finger_server(test_config["host"], "", test_config["port"])
     
@@ -80,6 +92,17 @@ def test_query_finger_server_empty_query(mocker, test_config):
     mock_sock.send.assert_called_once_with(expected_query.encode())
     assert response == "Project list"
 
+def test_query_finger_server_multiple_chunks(mocker, test_config):
+    """Test that a response split across several reads is reassembled."""
+    mock_sock = mocker.MagicMock()
+    mock_socket = mocker.patch("socket.socket")
+    mock_socket.return_value.__enter__.return_value = mock_sock
+    mock_recv_into(mock_sock, b"Project: ", b"test.project\n", b"content")
+    
+    response = query_finger_server(test_config["host"], test_config["query"], test_config["port"])
+    
+    assert response == "Project: test.project\ncontent"
+
 def test_query_finger_server_connection_timeout(mocker, test_config):
     """Test handling of connection timeout."""
     mock_socket = mocker.patch("socket.socket")
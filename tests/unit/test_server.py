@@ -1,7 +1,9 @@
 """Tests for the finger server using pytest and pytest-mock."""
 import asyncio
+import logging
 import os
 import shutil
+import socket
 import sys
 import tempfile
 from pathlib import Path
@@ -10,6 +12,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "thumbplanserver"))
 
 import pytest
+from _core import REQUEST_LIMIT, FileBody, FingerCore, _send_buffer_size, run
 from finger_server import FingerServer
 
 
@@ -35,15 +38,58 @@ def test_env():
     # Cleanup
     shutil.rmtree(test_dir)
 
+def test_core_requires_build_response(test_env):
+    """Test that FingerCore cannot be used without a request parser."""
+    with pytest.raises(TypeError):
+        FingerCore(test_env["test_dir"])
+
+@pytest.mark.parametrize("value, expected", [("262144", 262144), ("256k", 0)])
+def test_send_buffer_size(monkeypatch, caplog, value, expected):
+    """Test that a malformed THUMBPLAN_SNDBUF is ignored with a warning."""
+    monkeypatch.setenv("THUMBPLAN_SNDBUF", value)
+    assert _send_buffer_size() == expected
+    assert bool(caplog.records) == (expected == 0)
+
+def test_run_without_uvloop_run(mocker):
+    """Test that an installed uvloop older than 0.18 (no uvloop.run) falls back to asyncio."""
+    mocker.patch.dict(sys.modules, {"uvloop": object()})
+    asyncio_run = mocker.patch("asyncio.run")
+    coro = mocker.MagicMock()
+    
+    run(coro)
+    
+    asyncio_run.assert_called_once_with(coro)
+
 def test_list_projects(test_env):
     """Test listing of project files."""
     projects = test_env["server"]._list_projects()
     assert projects == ["2025/test.project"]
 
+def test_list_projects_skips_non_project_entries(test_env):
+    """Test that only *.project files inside numeric year dirs are listed."""
+    (test_env["year_dir"] / "notes.txt").write_text("ignored")
+    (test_env["year_dir"] / "sub.project").mkdir()
+    (Path(test_env["test_dir"]) / "archive").mkdir()
+    (Path(test_env["test_dir"]) / "archive" / "old.project").write_text("ignored")
+    
+    projects = test_env["server"]._list_projects()
+    assert projects == ["2025/test.project"]
+
+def test_list_projects_cached(test_env):
+    """Test that the project listing is memoized until cache_time passes."""
+    server = test_env["server"]
+    assert server._list_projects() == ["2025/test.project"]
+    
+    (test_env["year_dir"] / "new.project").write_text("New project")
+    assert server._list_projects() == ["2025/test.project"]
+    
+    server.cache_time = -1
+    assert server._list_projects() == ["2025/new.project", "2025/test.project"]
+
 def test_read_project_file(test_env):
     """Test reading project file content."""
     content = test_env["server"]._read_project_file(test_env["test_project"])
-    assert content == "Test project content"
+    assert content == b"Test project content"
 
 def test_read_nonexistent_project(test_env):
     """Test reading non-existent project file."""
@@ -52,55 +98,124 @@ def test_read_nonexistent_project(test_env):
     assert content is None
 
 def test_cache_invalidation(test_env):
-    """Test that cache expires after cache_time."""
+    """Test that a same-size edit is picked up through the changed mtime."""
     # Read file to cache it
     content1 = test_env["server"]._read_project_file(test_env["test_project"])
+    stats = test_env["test_project"].stat()
     
-    # Modify cache time to expire immediately
-    test_env["server"].cache_time = -1
-    
-    # Update file content
-    test_env["test_project"].write_text("Updated content")
+    # Update file content without changing its size, then move mtime forward
+    test_env["test_project"].write_text("Test project CONTENT")
+    os.utime(test_env["test_project"], ns=(stats.st_atime_ns, stats.st_mtime_ns + 1_000_000_000))
     
-    # Read again - should get updated content due to cache expiration
+    # Read again - should get updated content because the mtime changed
     content2 = test_env["server"]._read_project_file(test_env["test_project"])
     assert content1 != content2
-    assert content2 == "Updated content"
+    assert content2 == b"Test project CONTENT"
+
+def test_cache_hit_skips_read(test_env, mocker):
+    """Test that an unchanged file is served from cache without reopening it."""
+    server = test_env["server"]
+    server._read_project_file(test_env["test_project"])
+    
+    mock_open = mocker.patch("builtins.open")
+    assert server._read_project_file(test_env["test_project"]) == b"Test project content"
+    mock_open.assert_not_called()
+
+def test_cache_revalidates_on_file_change(test_env):
+    """Test that an edited file is re-read without waiting for cache_time."""
+    server = test_env["server"]
+    assert server._read_project_file(test_env["test_project"]) == b"Test project content"
+    
+    test_env["test_project"].write_text("Edited")
+    assert server._read_project_file(test_env["test_project"]) == b"Edited"
+
+def test_cache_bounded(test_env):
+    """Test that the least recently used entry is evicted past the limit."""
+    other = test_env["year_dir"] / "other.project"
+    other.write_text("Other project")
+    third = test_env["year_dir"] / "third.project"
+    third.write_text("Third project")
+    server = test_env["server"]
+    server.cache_max_entries = 2
+    
+    server._read_project_file(test_env["test_project"])
+    server._read_project_file(other)
+    # Touch the first entry so "other" becomes least recently used
+    server._read_project_file(test_env["test_project"])
+    server._read_project_file(third)
+    assert list(server.cache) == [str(test_env["test_project"]), str(third)]
+
+def test_large_file_not_cached(test_env):
+    """Test that files over the sendfile threshold are returned as FileBody."""
+    server = test_env["server"]
+    server.sendfile_threshold = 1
+    
+    body = server._read_project_file(test_env["test_project"])
+    assert body == FileBody(str(test_env["test_project"]), len(b"Test project content"))
+    assert body.read() == b"Test project content"
+    assert not server.cache
 
 @pytest.mark.asyncio
 async def test_process_request_empty(test_env):
     """Test processing empty request."""
     response = await test_env["server"].process_request("")
-    assert "2025/test.project" in response
+    assert b"2025/test.project" in response
+
+@pytest.mark.asyncio
+async def test_process_request_empty_reuses_response(test_env):
+    """Test that the encoded listing is reused until the listing is refreshed."""
+    server = test_env["server"]
+    first = await server.process_request("")
+    cached = server._listing_bytes
+    assert await server.process_request("") == first
+    assert server._listing_bytes is cached
+    
+    (test_env["year_dir"] / "new.project").write_text("New project")
+    server.cache_time = -1
+    refreshed = await server.process_request("")
+    assert b"2025/new.project" in refreshed
 
 @pytest.mark.asyncio
 async def test_process_request_specific_project(test_env):
     """Test processing request for specific project."""
     response = await test_env["server"].process_request("2025/test.project")
-    assert "Test project content" in response
+    assert b"Test project content" in response
+
+@pytest.mark.asyncio
+async def test_process_request_bytes(test_env):
+    """Test that raw request bytes are parsed without decoding first."""
+    response = await test_env["server"].process_request(b"2025/test.project\r\n")
+    assert response == b"Project: test.project\n\nTest project content\n"
 
 @pytest.mark.asyncio
 async def test_process_request_nonexistent_project(test_env):
     """Test processing request for non-existent project."""
     response = await test_env["server"].process_request("2025/nonexistent.project")
-    assert "not found" in response
+    assert b"not found" in response
 
 @pytest.mark.asyncio
 async def test_process_request_invalid_format(test_env):
     """Test processing invalid request format."""
     response = await test_env["server"].process_request("invalid/format")
-    assert "Invalid request" in response
+    assert b"Invalid request" in response
+
+@pytest.mark.asyncio
+async def test_process_request_nested_path(test_env):
+    """Test that requests with more than one path separator are rejected."""
+    response = await test_env["server"].process_request("2025/test.project/extra")
+    assert b"Invalid request" in response
 
 @pytest.mark.asyncio
-async def test_handle_client(test_env, mocker):
+async def test_handle_client(test_env, mocker, caplog):
     """Test client connection handling."""
+    caplog.set_level(logging.DEBUG, logger="_core")
     # Setup mocks
     mock_reader = mocker.AsyncMock()
     mock_writer = mocker.MagicMock()
     
-    mock_reader.read.return_value = b"2025/test.project"
-    mock_writer.get_extra_info.return_value = ("127.0.0.1", 12345)
-    mock_writer.write = mocker.MagicMock()
+    mock_reader.readuntil.return_value = b"2025/test.project\r\n"
+    mock_writer.get_extra_info.side_effect = {"peername": ("127.0.0.1", 12345)}.get
+    mock_writer.writelines = mocker.MagicMock()
     mock_writer.drain = mocker.AsyncMock()
     mock_writer.close = mocker.MagicMock()
     mock_writer.wait_closed = mocker.AsyncMock()
@@ -108,11 +223,121 @@ async def test_handle_client(test_env, mocker):
     # Handle client connection
     await test_env["server"].handle_client(mock_reader, mock_writer)
     
-    # Verify response was sent
-    mock_writer.write.assert_called_once()
-    response = mock_writer.write.call_args[0][0]
+    # Verify the request was logged lazily at debug level
+    assert ("Received %r from %r", (b"2025/test.project", ("127.0.0.1", 12345))) in [
+        (record.msg, record.args) for record in caplog.records
+    ]
+    
+    # Verify response was sent as header, body and trailer
+    mock_writer.writelines.assert_called_once_with(
+        [b"Project: test.project\n\n", b"Test project content", b"\n"]
+    )
+    mock_writer.drain.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_handle_client_sets_nodelay(test_env, mocker):
+    """Test that the accepted socket has Nagle disabled before responding."""
+    mock_reader = mocker.AsyncMock()
+    mock_writer = mocker.MagicMock()
+    mock_sock = mocker.MagicMock()
+    
+    mock_reader.readuntil.return_value = b"\r\n"
+    mock_writer.get_extra_info.side_effect = {"peername": ("127.0.0.1", 12345), "socket": mock_sock}.get
+    mock_writer.drain = mocker.AsyncMock()
+    mock_writer.wait_closed = mocker.AsyncMock()
+    
+    await test_env["server"].handle_client(mock_reader, mock_writer)
+    
+    mock_sock.setsockopt.assert_called_once_with(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    mock_writer.writelines.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_handle_client_unterminated_request(test_env, mocker):
+    """Test that a query sent without CRLF before EOF is still answered."""
+    mock_reader = mocker.AsyncMock()
+    mock_writer = mocker.MagicMock()
+    
+    mock_reader.readuntil.side_effect = asyncio.IncompleteReadError(b"2025/test.project", None)
+    mock_writer.get_extra_info.side_effect = {"peername": ("127.0.0.1", 12345)}.get
+    mock_writer.drain = mocker.AsyncMock()
+    mock_writer.wait_closed = mocker.AsyncMock()
+    
+    await test_env["server"].handle_client(mock_reader, mock_writer)
+    
+    response = b"".join(mock_writer.writelines.call_args[0][0])
     assert b"Test project content" in response
 
+@pytest.mark.asyncio
+async def test_handle_client_sendfile(test_env):
+    """Test that a large project file is sent over a real socket via sendfile."""
+    server = test_env["server"]
+    server.sendfile_threshold = 1
+    srv = await asyncio.start_server(server.handle_client, "127.0.0.1", 0)
+    port = srv.sockets[0].getsockname()[1]
+    
+    async with srv:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"2025/test.project\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        await writer.wait_closed()
+    
+    assert response == b"Project: test.project\n\nTest project content\n"
+
+@pytest.mark.asyncio
+async def test_handle_client_sendfile_unsupported(test_env, mocker):
+    """Test the copy fallback for event loops without loop.sendfile (e.g. uvloop)."""
+    server = test_env["server"]
+    server.sendfile_threshold = 1
+    mocker.patch.object(asyncio.get_running_loop(), "sendfile", side_effect=NotImplementedError)
+    srv = await asyncio.start_server(server.handle_client, "127.0.0.1", 0)
+    port = srv.sockets[0].getsockname()[1]
+    
+    async with srv:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"2025/test.project\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        await writer.wait_closed()
+    
+    assert response == b"Project: test.project\n\nTest project content\n"
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [2000, 200_000, 2_000_000])
+async def test_handle_client_request_too_long(test_env, caplog, size):
+    """Test that a query longer than REQUEST_LIMIT gets the invalid-request reply."""
+    server = test_env["server"]
+    srv = await asyncio.start_server(server.handle_client, "127.0.0.1", 0, limit=REQUEST_LIMIT)
+    port = srv.sockets[0].getsockname()[1]
+    
+    async with srv:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"a" * size + b"\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        await writer.wait_closed()
+    
+    assert response == server.invalid_request_reply
+    assert not [record for record in caplog.records if record.levelno >= logging.WARNING]
+
+@pytest.mark.asyncio
+async def test_send_file_fallback_streams_in_chunks(test_env, mocker):
+    """Test that the no-sendfile fallback never reads more than one chunk at a time."""
+    mocker.patch("_core.SENDFILE_FALLBACK_CHUNK", 4)
+    mocker.patch.object(asyncio.get_running_loop(), "sendfile", side_effect=NotImplementedError)
+    mock_writer = mocker.MagicMock()
+    mock_writer.drain = mocker.AsyncMock()
+    body = FileBody(str(test_env["test_project"]), len(b"Test project content"))
+    
+    await test_env["server"]._send_file(mock_writer, body)
+    
+    chunks = [call.args[0] for call in mock_writer.write.call_args_list]
+    assert b"".join(chunks) == b"Test project content"
+    assert max(len(chunk) for chunk in chunks) == 4
+
 @pytest.mark.asyncio
 async def test_handle_client_error(test_env, mocker):
     """Test client connection error handling."""
@@ -120,8 +345,8 @@ async def test_handle_client_error(test_env, mocker):
     mock_reader = mocker.AsyncMock()
     mock_writer = mocker.MagicMock()
     
-    mock_reader.read = mocker.AsyncMock(side_effect=ConnectionError)
-    mock_writer.get_extra_info.return_value = ("127.0.0.1", 12345)
+    mock_reader.readuntil = mocker.AsyncMock(side_effect=ConnectionError)
+    mock_writer.get_extra_info.side_effect = {"peername": ("127.0.0.1", 12345)}.get
     mock_writer.close = mocker.MagicMock()
     mock_writer.wait_closed = mocker.AsyncMock()
     
@@ -0,0 +1,114 @@
+"""Tests for the Windows-compatible finger server using pytest and pytest-mock."""
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add thumbplanserver directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "thumbplanserver"))
+
+import pytest
+from finger_server_win import FingerServer
+
+USAGE = b"Usage: finger [-l] [year/project]@host\n"
+MTIME = 1_700_000_000
+
+
+@pytest.fixture()
+def test_env():
+    """Create test environment with temporary files."""
+    test_dir = tempfile.mkdtemp()
+    year_dir = Path(test_dir) / "2025"
+    year_dir.mkdir()
+
+    test_project = year_dir / "x.project"
+    test_project.write_text("X content")
+    os.utime(test_project, (MTIME, MTIME))
+
+    yield {
+        "test_dir": test_dir,
+        "year_dir": year_dir,
+        "test_project": test_project,
+        "server": FingerServer(test_dir)
+    }
+
+    shutil.rmtree(test_dir)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("request_text, expected", [
+    ("@h", b"Available projects:\n2025/x.project\n"),
+    ("2025/x.project@h", b"Project: x.project\n\nX content\n"),
+    ("2025/@h", b"Project  not found in year 2025\n"),
+    ("a@b@c", b"Invalid request format. Use: finger [-l] [user]@host\n"),
+])
+async def test_process_request(test_env, request_text, expected):
+    """Test responses for the standard [-l] [year/project]@host forms."""
+    response = await test_env["server"].process_request(request_text)
+    assert response == expected
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("request_text", ["abc/def@h", "x@h", ""])
+async def test_process_request_usage(test_env, request_text):
+    """Test that requests without a year/project or host get the usage text."""
+    response = await test_env["server"].process_request(request_text)
+    assert response.startswith(USAGE)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("request_text", [
+    b"-l" + b" " * 1018 + b"x\r\n",
+    b"-l " + b" " * 100_000 + b"x",
+    b"2025/x.project" + b" " * 100_000 + b"@h",
+])
+async def test_process_request_whitespace_padding_is_linear(test_env, request_text):
+    """Test that whitespace-padded queries parse without regex backtracking blowup."""
+    start = time.perf_counter()
+    await test_env["server"].process_request(request_text)
+    assert time.perf_counter() - start < 0.5
+
+@pytest.mark.asyncio
+async def test_process_request_long_listing(test_env):
+    """Test the -l listing size and YYYY-MM-DD HH:MM:SS columns."""
+    response = await test_env["server"].process_request("-l @h")
+
+    modified = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(MTIME))
+    assert re.fullmatch(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}", modified)
+    assert response == (
+        b"Project listing (detailed):\n"
+        + f"{'2025/x.project':<30} {9:>8} bytes  {modified}\n".encode()
+    )
+
+@pytest.mark.asyncio
+async def test_process_request_long_project(test_env):
+    """Test -l project metadata, with extra spaces after the flag."""
+    response = await test_env["server"].process_request("-l  2025/x.project@h")
+
+    modified = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(MTIME))
+    assert response == (
+        b"Project: x.project\n"
+        b"Location: 2025/x.project\n"
+        b"Size: 9 bytes\n"
+        + f"Modified: {modified}\n".encode()
+        + b"\nContent:\nX content\n"
+    )
+
+@pytest.mark.asyncio
+async def test_process_request_long_listing_deleted_file(test_env):
+    """Test -l listing of a file deleted after the listing was cached."""
+    server = test_env["server"]
+    await server.process_request("@h")
+    test_env["test_project"].unlink()
+
+    response = await server.process_request("-l @h")
+    assert response == b"Project listing (detailed):\n" + f"{'2025/x.project':<30} ".encode() + \
+        b"(error reading file: file not found)\n"
+
+def test_describe_projects_missing_year_dir(test_env):
+    """Test that a listed project in a removed year directory reports the error."""
+    shutil.rmtree(test_env["year_dir"])
+
+    details = test_env["server"]._describe_projects(["2025/x.project"])
+    assert len(details) == 1
+    assert details[0].startswith(f"{'2025/x.project':<30} (error reading file: ")
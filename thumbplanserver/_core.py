@@ -0,0 +1,251 @@
+"""Shared core of the finger daemons: file cache, project listing and connection handling."""
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Coroutine
+from pathlib import Path
+from typing import Any, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+def _send_buffer_size() -> int:
+    """Read the THUMBPLAN_SNDBUF override, falling back to 0 for values that are not byte counts."""
+    value = os.environ.get("THUMBPLAN_SNDBUF", "0")
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning("Ignoring THUMBPLAN_SNDBUF=%r: expected a size in bytes", value)
+        return 0
+
+CACHE_MAX_ENTRIES = 1024  # Project files kept in memory
+REQUEST_LIMIT = 1024  # Longest accepted query line, in bytes
+REJECT_LINGER_TIMEOUT = 2.0  # Seconds to drain input after rejecting an over-long query
+SENDFILE_THRESHOLD = 1 << 20  # Files this large are sent with sendfile instead of cached
+SENDFILE_FALLBACK_CHUNK = 65536  # Read size when the event loop has no sendfile
+# Opt-in SO_SNDBUF override in bytes (e.g. 262144); unset leaves kernel autotuning alone
+SEND_BUFFER_SIZE = _send_buffer_size()
+
+def run(main: Coroutine[Any, Any, None]):
+    """Run the daemon on uvloop when it is installed, otherwise on the default asyncio loop."""
+    try:
+        from uvloop import run as uvloop_run
+    except ImportError:
+        # uvloop is optional, unavailable on Windows, and only has run() since 0.18
+        asyncio.run(main)
+    else:
+        uvloop_run(main)
+
+class FileBody(NamedTuple):
+    """Project file too large to cache, streamed to the client with sendfile."""
+
+    path: str
+    size: int
+
+    def read(self) -> bytes:
+        """Read the file contents for callers that need the full response in memory."""
+        with open(self.path, "rb") as f:
+            return f.read(self.size)
+
+class FingerCore(ABC):
+    """Caching, project listing and connection handling shared by the finger servers."""
+
+    # Reply sent for queries the server cannot parse
+    invalid_request_reply: bytes
+
+    def __init__(self, plan_dir: str | Path):
+        """
+        Initialize the finger server.
+        
+        Args:
+            plan_dir: Directory containing project files organized by year
+        """
+        self.plan_dir = Path(plan_dir)
+        # Plain string form for os.path.join on the per-request path
+        self._plan_dir_str = os.fspath(self.plan_dir)
+        self.cache: OrderedDict[str, tuple[int, int, bytes]] = OrderedDict()
+        self.cache_max_entries = CACHE_MAX_ENTRIES
+        self.sendfile_threshold = SENDFILE_THRESHOLD
+        self.cache_time = 300  # 5 minutes listing cache
+        self._list_cache: tuple[float, list[str]] | None = None
+        self._listing_bytes: tuple[list[str], bytes] | None = None
+        # File I/O runs in worker threads, so guard the shared cache
+        self._cache_lock = threading.Lock()
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handle incoming finger protocol connection."""
+        try:
+            addr = writer.get_extra_info("peername")
+            self._tune_socket(writer)
+            try:
+                # Finger queries are a single CRLF-terminated line
+                data = await reader.readuntil(b"\n")
+            except asyncio.IncompleteReadError as e:
+                # Client closed without a line terminator; use what it sent
+                data = e.partial
+            except (asyncio.LimitOverrunError, ValueError):
+                # Query longer than REQUEST_LIMIT; debug level so clients cannot flood the log
+                logger.debug("Request from %r exceeds %d bytes", addr, REQUEST_LIMIT)
+                writer.write(self.invalid_request_reply)
+                await writer.drain()
+                await self._discard_input(reader, writer)
+                return
+            # Queries are ASCII; parse them as bytes without decoding
+            request = data.strip()
+            
+            logger.debug("Received %r from %r", request, addr)
+            
+            # Queue header, body and trailer with writelines so large file
+            # contents are never copied into one response buffer, then drain
+            # once; only a sendfile body needs the earlier chunks flushed first
+            pending: list[bytes] = []
+            for chunk in await self._build_response(request):
+                if isinstance(chunk, bytes):
+                    pending.append(chunk)
+                else:
+                    writer.writelines(pending)
+                    pending = []
+                    await self._send_file(writer, chunk)
+            writer.writelines(pending)
+            await writer.drain()
+            
+        except Exception as e:
+            logger.error("Error handling client: %s", e)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    async def _discard_input(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Half-close and read off unread input so closing does not reset the sent reply."""
+        # Closing with unread data in the receive buffer makes the kernel send
+        # a RST, which can discard the reply before the client reads it
+        writer.write_eof()
+        try:
+            async with asyncio.timeout(REJECT_LINGER_TIMEOUT):
+                while await reader.read(65536):
+                    pass
+        except (TimeoutError, ConnectionError):
+            pass
+
+    def _tune_socket(self, writer: asyncio.StreamWriter):
+        """Disable Nagle and optionally enlarge the send buffer for the response."""
+        sock = writer.get_extra_info("socket")
+        if sock is None:
+            return
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if SEND_BUFFER_SIZE > 0:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER_SIZE)
+        except OSError as e:
+            logger.warning("Error tuning socket: %s", e)
+
+    async def _send_file(self, writer: asyncio.StreamWriter, body: FileBody):
+        """Send a file body with zero-copy sendfile where the event loop supports it."""
+        f = await asyncio.to_thread(open, body.path, "rb")
+        try:
+            try:
+                await asyncio.get_running_loop().sendfile(writer.transport, f, 0, body.size)
+            except NotImplementedError:
+                # uvloop does not implement loop.sendfile; stream through the
+                # transport in bounded chunks instead of reading the whole file
+                remaining = body.size
+                while remaining > 0:
+                    chunk = await asyncio.to_thread(f.read, min(SENDFILE_FALLBACK_CHUNK, remaining))
+                    if not chunk:
+                        break
+                    writer.write(chunk)
+                    await writer.drain()
+                    remaining -= len(chunk)
+        finally:
+            f.close()
+
+    def _read_project_file(self, filepath: str | Path) -> bytes | FileBody | None:
+        """Read and cache project file content, revalidated against its mtime and size."""
+        # Use string representation of path as cache key
+        cache_key = os.fspath(filepath)
+        try:
+            stats = os.stat(cache_key)
+        except OSError:
+            return None
+        
+        if stats.st_size >= self.sendfile_threshold:
+            return FileBody(cache_key, stats.st_size)
+        
+        with self._cache_lock:
+            cached = self.cache.get(cache_key)
+            if cached is not None and cached[:2] == (stats.st_mtime_ns, stats.st_size):
+                self.cache.move_to_end(cache_key)
+                return cached[2]
+        
+        try:
+            with open(cache_key, "rb") as f:
+                content = f.read()
+        except Exception as e:
+            logger.error("Error reading %s: %s", filepath, e)
+            return None
+        
+        with self._cache_lock:
+            self.cache[cache_key] = (stats.st_mtime_ns, stats.st_size, content)
+            self.cache.move_to_end(cache_key)
+            while len(self.cache) > self.cache_max_entries:
+                self.cache.popitem(last=False)
+        return content
+
+    def _list_projects(self) -> list[str]:
+        """List all project files, cached for cache_time seconds."""
+        now = time.monotonic()
+        
+        if self._list_cache is not None:
+            timestamp, projects = self._list_cache
+            if now - timestamp < self.cache_time:
+                return projects
+        
+        projects = self._scan_projects()
+        self._list_cache = (now, projects)
+        return projects
+
+    def _listing_response(self, projects: list[str]) -> bytes:
+        """Encode the project listing, reusing it while the cached listing is unchanged."""
+        cached = self._listing_bytes
+        if cached is not None and cached[0] is projects:
+            return cached[1]
+        
+        response = ("Available projects:\n" + "\n".join(projects) + "\n").encode()
+        self._listing_bytes = (projects, response)
+        return response
+
+    def _scan_projects(self) -> list[str]:
+        """Walk plan_dir for <year>/<name>.project files."""
+        projects: list[str] = []
+        try:
+            # os.scandir reuses the d_type from readdir, avoiding a stat() per entry
+            year_entries = os.scandir(self._plan_dir_str)
+        except FileNotFoundError:
+            return projects
+        with year_entries:
+            for year_dir in year_entries:
+                if year_dir.is_dir(follow_symlinks=False) and year_dir.name.isdigit():
+                    with os.scandir(year_dir.path) as project_entries:
+                        for project_file in project_entries:
+                            if project_file.name.endswith(".project") and project_file.is_file(follow_symlinks=False):
+                                projects.append(f"{year_dir.name}/{project_file.name}")
+        projects.sort()
+        return projects
+
+    async def process_request(self, request: str | bytes) -> bytes:
+        """Process finger request and return the complete response."""
+        if isinstance(request, str):
+            request = request.encode()
+        chunks = await self._build_response(request)
+        return b"".join([
+            chunk if isinstance(chunk, bytes) else await asyncio.to_thread(chunk.read)
+            for chunk in chunks
+        ])
+
+    @abstractmethod
+    async def _build_response(self, request: bytes) -> list[bytes | FileBody]:
+        """Build the finger response as a list of byte chunks."""
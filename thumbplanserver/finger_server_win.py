@@ -5,136 +5,105 @@ Compatible with standard finger protocol and Windows Finger Service.
 """
 import argparse
 import asyncio
-import datetime
+import logging
+import os
+import re
+import time
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+
+from _core import REQUEST_LIMIT, FileBody, FingerCore, run
 
 FINGER_PORT = 79  # Standard finger protocol port
+# [-l ][year/]project@host in one match: groups are long flag, year, project.
+# Possessive quantifiers keep the match linear; trailing spaces are stripped after.
+REQUEST_RE = re.compile(rb"(-l )?\s*+(?:(\d+)/)?([^@]*+)@[^@]*+")
 
-class FingerServer:
-    def __init__(self, plan_dir: Union[str, Path]):
-        """
-        Initialize the finger server.
-        
-        Args:
-            plan_dir: Directory containing project files organized by year
-        """
-        self.plan_dir = Path(plan_dir)
-        self.cache: Dict[str, tuple[float, str]] = {}
-        self.cache_time = 300  # 5 minutes cache
+def _format_mtime(mtime: float) -> str:
+    """Format a file modification time as local YYYY-MM-DD HH:MM:SS."""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mtime))
 
-    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
-        """Handle incoming finger protocol connection."""
-        try:
-            data = await reader.read(1024)
-            message = data.decode().strip()
-            addr = writer.get_extra_info("peername")
-            
-            print(f"Received {message!r} from {addr!r}")
-            
-            response = await self.process_request(message)
-            
-            writer.write(response.encode())
-            await writer.drain()
-            
-        except Exception as e:
-            print(f"Error handling client: {e}")
-        finally:
-            writer.close()
-            await writer.wait_closed()
+class FingerServer(FingerCore):
+    invalid_request_reply = b"Invalid request format. Use: finger [-l] [user]@host\n"
 
-    def _read_project_file(self, filepath: Path) -> Optional[str]:
-        """Read and cache project file content."""
-        now = datetime.datetime.now().timestamp()
-        
-        cache_key = str(filepath)
-        if cache_key in self.cache:
-            timestamp, content = self.cache[cache_key]
-            if now - timestamp < self.cache_time:
-                return content
+    def _describe_projects(self, projects: list[str]) -> list[str]:
+        """Format size and modification time for each listed project."""
+        # Stat through one scandir pass per year; DirEntry caches stat results on Windows
+        wanted = set(projects)
+        file_stats: dict[str, os.stat_result | OSError] = {}
+        for year in {proj.partition("/")[0] for proj in projects}:
+            try:
+                with os.scandir(os.path.join(self._plan_dir_str, year)) as entries:
+                    for entry in entries:
+                        proj = f"{year}/{entry.name}"
+                        if proj in wanted:
+                            try:
+                                file_stats[proj] = entry.stat()
+                            except OSError as e:
+                                file_stats[proj] = e
+            except OSError as e:
+                for proj in wanted:
+                    if proj.startswith(f"{year}/"):
+                        file_stats[proj] = e
         
-        try:
-            if filepath.exists():
-                content = filepath.read_text()
-                self.cache[cache_key] = (now, content)
-                return content
-        except Exception as e:
-            print(f"Error reading {filepath}: {e}")
-        return None
+        project_details = []
+        for proj in projects:
+            stats = file_stats.get(proj)
+            if isinstance(stats, os.stat_result):
+                modified = _format_mtime(stats.st_mtime)
+                project_details.append(f"{proj:<30} {stats.st_size:>8} bytes  {modified}")
+            else:
+                project_details.append(f"{proj:<30} (error reading file: {stats or 'file not found'})")
+        return project_details
 
-    def _list_projects(self) -> List[str]:
-        """List all project files."""
-        projects = []
-        for year_dir in self.plan_dir.glob("*"):
-            if year_dir.is_dir() and year_dir.name.isdigit():
-                for project_file in year_dir.glob("*.project"):
-                    projects.append(f"{year_dir.name}/{project_file.name}")
-        return sorted(projects)
-
-    async def process_request(self, request: str) -> str:
-        """Process finger request following standard finger protocol."""
+    async def _build_response(self, request: bytes) -> list[bytes | FileBody]:
+        """Build the finger response as a list of byte chunks."""
         request = request.strip()
         
         # Parse standard finger format: [user]@host or -l [user]@host
-        is_long_format = False
-        if request.startswith("-l "):
-            is_long_format = True
-            request = request[3:].strip()
-            
-        # Handle standard finger protocol format
-        if "@" in request:
-            parts = request.split("@")
-            if len(parts) != 2:
-                return "Invalid request format. Use: finger [-l] [user]@host\n"
-            user = parts[0].strip()
+        match = REQUEST_RE.fullmatch(request)
+        if match is None:
+            if request.count(b"@") > 1:
+                return [self.invalid_request_reply]
+        else:
+            long_flag, year, project = match.groups()
+            project = project.rstrip()
+            is_long_format = long_flag is not None
             
             # No user specified, list all projects
-            if not user:
-                projects = self._list_projects()
-                header = "Project listing (detailed):\n" if is_long_format else "Available projects:\n"
+            if year is None and not project:
+                projects = await asyncio.to_thread(self._list_projects)
                 if is_long_format:
                     # Add extra details for -l format
-                    project_details = []
-                    for proj in projects:
-                        year, name = proj.split("/")
-                        path = self.plan_dir / year / name
-                        try:
-                            stats = path.stat()
-                            size = stats.st_size
-                            modified = datetime.datetime.fromtimestamp(stats.st_mtime)
-                            project_details.append(f"{proj:<30} {size:>8} bytes  {modified}")
-                        except Exception as e:
-                            project_details.append(f"{proj:<30} (error reading file: {e})")
-                    return header + "\n".join(project_details) + "\n"
-                return header + "\n".join(projects) + "\n"
+                    project_details = await asyncio.to_thread(self._describe_projects, projects)
+                    return [("Project listing (detailed):\n" + "\n".join(project_details) + "\n").encode()]
+                return [self._listing_response(projects)]
             
             # Specific project request - expect year/project format
-            if "/" in user:
-                year, project = user.split("/", 1)
-                if year.isdigit():
-                    project_path = self.plan_dir / year / project
-                    content = self._read_project_file(project_path)
-                    if content:
-                        if is_long_format:
-                            try:
-                                # Add metadata for -l format
-                                stats = project_path.stat()
-                                header = f"Project: {project}\n"
-                                header += f"Location: {year}/{project}\n"
-                                header += f"Size: {stats.st_size} bytes\n"
-                                header += f"Modified: {datetime.datetime.fromtimestamp(stats.st_mtime)}\n"
-                                header += "\nContent:\n"
-                                return header + content + "\n"
-                            except Exception as e:
-                                return f"Error reading project metadata: {e}\n\n{content}\n"
-                        return f"Project: {project}\n\n{content}\n"
-                    return f"Project {project} not found in year {year}\n"
+            if year is not None:
+                year, project = year.decode(), project.decode()
+                project_path = os.path.join(self._plan_dir_str, year, project)
+                content = await asyncio.to_thread(self._read_project_file, project_path)
+                if content:
+                    if is_long_format:
+                        try:
+                            # Add metadata for -l format
+                            stats = os.stat(project_path)
+                            header = f"Project: {project}\n"
+                            header += f"Location: {year}/{project}\n"
+                            header += f"Size: {stats.st_size} bytes\n"
+                            header += f"Modified: {_format_mtime(stats.st_mtime)}\n"
+                            header += "\nContent:\n"
+                            return [header.encode(), content, b"\n"]
+                        except Exception as e:
+                            return [f"Error reading project metadata: {e}\n\n".encode(), content, b"\n"]
+                    return [f"Project: {project}\n\n".encode(), content, b"\n"]
+                return [f"Project {project} not found in year {year}\n".encode()]
             
-        return "Usage: finger [-l] [year/project]@host\nExamples:\n" + \
-               "  finger @host              - List all projects\n" + \
-               "  finger -l @host           - List all projects with details\n" + \
-               "  finger 2025/proj@host     - View specific project\n" + \
-               "  finger -l 2025/proj@host  - View project with details\n"
+        return [b"Usage: finger [-l] [year/project]@host\nExamples:\n"
+                b"  finger @host              - List all projects\n"
+                b"  finger -l @host           - List all projects with details\n"
+                b"  finger 2025/proj@host     - View specific project\n"
+                b"  finger -l 2025/proj@host  - View project with details\n"]
 
 async def main():
     parser = argparse.ArgumentParser(description="Finger daemon for project files")
@@ -142,14 +111,21 @@ async def main():
                        help="Host to bind to (default: 127.0.0.1)")
     parser.add_argument("--port", type=int, default=FINGER_PORT,
                        help=f"Port to listen on (default: {FINGER_PORT}, standard finger port)")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                       help="Log every received request")
     args = parser.parse_args()
 
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(levelname)s: %(message)s"
+    )
+
     plan_dir = str(Path(__file__).parent.parent / "planfiles")
     server = FingerServer(plan_dir)
     
     try:
         srv = await asyncio.start_server(
-            server.handle_client, args.host, args.port
+            server.handle_client, args.host, args.port, limit=REQUEST_LIMIT
         )
         
         addr = srv.sockets[0].getsockname()
@@ -175,4 +151,4 @@ async def main():
         print(f"Error starting server: {e}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())